@@ -3,6 +3,21 @@ import json
 import os
 from PyQt6.QtCore import QTimer
 
+# Fallback error patterns used when error_list.txt is missing
+DEFAULT_ERROR_LIST = (
+    "This person is unavailable on Messenger.",
+    "can't access this chat yet",
+    "You've reached the message request limit",
+    "This person isn't available right now",
+    "You can't message this account",
+    "Message request limit reached",
+    "This person isn't available",
+    "unavailable on Messenger",
+    "can't access this chat",
+    "Facebook user",
+    "This chat is now secured with end-to-end encryption."
+)
+
 def make_typing_script(message, autosend=True):
     msg_js = json.dumps(message)  # safe escaping
     return f"""
@@ -161,6 +176,125 @@ def make_typing_script(message, autosend=True):
 }})();
 """
 
+# Static page scripts, built once at import rather than on every attempt
+POPUP_BLOCK_JS = """
+// Permanent popup blocking - runs on every page
+(function() {
+    // Block all browser dialogs permanently
+    window.alert = function() { console.log('Alert blocked permanently'); };
+    window.confirm = function() { console.log('Confirm blocked permanently'); return true; };
+    window.prompt = function() { console.log('Prompt blocked permanently'); return ''; };
+
+    // Disable right-click context menu and view source
+    document.addEventListener('contextmenu', function(e) {
+        e.preventDefault();
+        console.log('Right-click context menu blocked');
+        return false;
+    });
+
+    // Disable keyboard shortcuts for view source
+    document.addEventListener('keydown', function(e) {
+        // Ctrl+U (View Source)
+        if (e.ctrlKey && e.key === 'u') {
+            e.preventDefault();
+            console.log('View source shortcut blocked');
+            return false;
+        }
+        // F12 (Developer Tools)
+        if (e.key === 'F12') {
+            e.preventDefault();
+            console.log('Developer Tools blocked');
+            return false;
+        }
+        // Ctrl+Shift+I (Developer Tools)
+        if (e.ctrlKey && e.shiftKey && e.key === 'I') {
+            e.preventDefault();
+            console.log('Developer Tools shortcut blocked');
+            return false;
+        }
+    });
+
+    // Function to close all popups - SAFE VERSION (only clicks close buttons, no removal of containers)
+    function closeAllPopups() {
+        try {
+            // SAFE: Only click explicit close buttons, don't remove generic containers
+            const closeButtons = document.querySelectorAll(
+                'button[aria-label="Close"], [aria-label="Close dialog"], [data-testid="close"]'
+            );
+            closeButtons.forEach(btn => { 
+                try { 
+                    if (btn && btn.click) {
+                        btn.click(); 
+                        console.log('Clicked close button');
+                    }
+                } catch(e){} 
+            });
+
+            // Remove CSP meta tags (safe to remove)
+            document.querySelectorAll('meta[http-equiv="Content-Security-Policy"]').forEach(meta => meta.remove());
+
+        } catch (error) {
+            console.log('Error in popup blocking:', error);
+        }
+    }
+
+    // Run immediately
+    closeAllPopups();
+
+    // Run every 2 seconds to catch new popups
+    setInterval(closeAllPopups, 2000);
+
+    // Also run on DOM changes
+    const observer = new MutationObserver(function(mutations) {
+        mutations.forEach(function(mutation) {
+            if (mutation.addedNodes.length > 0) {
+                setTimeout(closeAllPopups, 100);
+            }
+        });
+    });
+
+    observer.observe(document.body, {
+        childList: true,
+        subtree: true
+    });
+
+    console.log('Permanent popup blocking activated');
+})();
+"""
+
+# One-time CSP meta tag removal
+CSP_REMOVE_JS = """
+(function() {
+    try {
+        // Remove CSP meta tags
+        document.querySelectorAll('meta[http-equiv="Content-Security-Policy"]').forEach(meta => meta.remove());
+        console.log('CSP disabled successfully');
+        return true;
+    } catch (error) {
+        console.log('Error disabling CSP:', error);
+        return false;
+    }
+})()
+"""
+
+# Message box detection, result handled in _message_box_callback
+MESSAGE_BOX_DETECTION_JS = """
+(function() {
+    try {
+        // Simple check for any contenteditable element
+        // (no console logging: each message is an extra renderer IPC per attempt)
+        const box = document.querySelector('[contenteditable="true"]');
+        if (box) {
+            return {present: true, element: 'found'};
+        } else {
+            return {present: false, reason: 'No contenteditable elements'};
+        }
+    } catch (error) {
+        return {present: false, reason: 'Script error: ' + error.toString()};
+    }
+})()
+"""
+
 class BrowserAutomation:
     def __init__(self, browser):
         self.browser = browser
@@ -172,97 +306,19 @@ class BrowserAutomation:
         self.callback = None  # Callback function for completion
         self.error_detected = False  # Initialize error detection flag
         self.message_box_present = False  # Initialize message box presence flag
+        
+        # Reusable timer pair: the repeating attempt timer and a single-shot
+        # deadline that stops it. Created and wired once instead of per run.
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.attempt_typing)
+        self.deadline_timer = QTimer()
+        self.deadline_timer.setSingleShot(True)
+        self.deadline_timer.timeout.connect(self.timer.stop)
     
     def setup_permanent_popup_blocking(self):
         """Set up permanent popup blocking that runs on every page load"""
-        # This script runs on every page load to block popups permanently
-        popup_block_script = """
-        // Permanent popup blocking - runs on every page
-        (function() {
-            // Block all browser dialogs permanently
-            window.alert = function() { console.log('Alert blocked permanently'); };
-            window.confirm = function() { console.log('Confirm blocked permanently'); return true; };
-            window.prompt = function() { console.log('Prompt blocked permanently'); return ''; };
-            
-            // Disable right-click context menu and view source
-            document.addEventListener('contextmenu', function(e) {
-                e.preventDefault();
-                console.log('Right-click context menu blocked');
-                return false;
-            });
-            
-            // Disable keyboard shortcuts for view source
-            document.addEventListener('keydown', function(e) {
-                // Ctrl+U (View Source)
-                if (e.ctrlKey && e.key === 'u') {
-                    e.preventDefault();
-                    console.log('View source shortcut blocked');
-                    return false;
-                }
-                // F12 (Developer Tools)
-                if (e.key === 'F12') {
-                    e.preventDefault();
-                    console.log('Developer Tools blocked');
-                    return false;
-                }
-                // Ctrl+Shift+I (Developer Tools)
-                if (e.ctrlKey && e.shiftKey && e.key === 'I') {
-                    e.preventDefault();
-                    console.log('Developer Tools shortcut blocked');
-                    return false;
-                }
-            });
-            
-            // Function to close all popups - SAFE VERSION (only clicks close buttons, no removal of containers)
-            function closeAllPopups() {
-                try {
-                    // SAFE: Only click explicit close buttons, don't remove generic containers
-                    const closeButtons = document.querySelectorAll(
-                        'button[aria-label="Close"], [aria-label="Close dialog"], [data-testid="close"]'
-                    );
-                    closeButtons.forEach(btn => { 
-                        try { 
-                            if (btn && btn.click) {
-                                btn.click(); 
-                                console.log('Clicked close button');
-                            }
-                        } catch(e){} 
-                    });
-                    
-                    // Remove CSP meta tags (safe to remove)
-                    document.querySelectorAll('meta[http-equiv="Content-Security-Policy"]').forEach(meta => meta.remove());
-                    
-                } catch (error) {
-                    console.log('Error in popup blocking:', error);
-                }
-            }
-            
-            // Run immediately
-            closeAllPopups();
-            
-            // Run every 2 seconds to catch new popups
-            setInterval(closeAllPopups, 2000);
-            
-            // Also run on DOM changes
-            const observer = new MutationObserver(function(mutations) {
-                mutations.forEach(function(mutation) {
-                    if (mutation.addedNodes.length > 0) {
-                        setTimeout(closeAllPopups, 100);
-                    }
-                });
-            });
-            
-            observer.observe(document.body, {
-                childList: true,
-                subtree: true
-            });
-            
-            console.log('Permanent popup blocking activated');
-        })();
-        """
-        
         # Inject the permanent popup blocking script
-        self.browser.page().runJavaScript(popup_block_script)
+        self.browser.page().runJavaScript(POPUP_BLOCK_JS)
         
     def disable_csp_and_popups(self):
         """Disable Content Security Policy and block popups for the browser - run on every attempt"""
@@ -271,20 +327,7 @@ class BrowserAutomation:
         
         # Additional one-time CSP removal
         if not self.csp_disabled:
-            csp_script = """
-            (function() {
-                try {
-                    // Remove CSP meta tags
-                    document.querySelectorAll('meta[http-equiv="Content-Security-Policy"]').forEach(meta => meta.remove());
-                    console.log('CSP disabled successfully');
-                    return true;
-                } catch (error) {
-                    console.log('Error disabling CSP:', error);
-                    return false;
-                }
-            })()
-            """
-            self.browser.page().runJavaScript(csp_script)
+            self.browser.page().runJavaScript(CSP_REMOVE_JS)
             self.csp_disabled = True
     
     def type_message(self, message="hi", autosend=True):
@@ -308,14 +351,14 @@ class BrowserAutomation:
             self.message_sent = True
             success = True
             # Stop the timer immediately when message is sent successfully
-            if hasattr(self, 'timer') and self.timer.isActive():
+            if self.timer.isActive():
                 self.timer.stop()
                 print("Automation timer stopped")
         else:
             reason = result.get('reason', 'Unknown error') if result else 'No result returned'
             print(f"Message typing failed - {reason}")
             self.attempt_count += 1
-            if self.attempt_count >= self.max_attempts and hasattr(self, 'timer') and self.timer.isActive():
+            if self.attempt_count >= self.max_attempts and self.timer.isActive():
                 print("Max attempts reached, stopping automation")
                 self.timer.stop()
         
@@ -332,7 +375,7 @@ class BrowserAutomation:
         
         if self.attempt_count >= self.max_attempts:
             print("Max attempts reached, skipping attempt")
-            if hasattr(self, 'timer') and self.timer.isActive():
+            if self.timer.isActive():
                 self.timer.stop()
             return
         
@@ -340,14 +383,36 @@ class BrowserAutomation:
         self.csp_disabled = False  # Reset to ensure CSP is disabled on new pages
         self.disable_csp_and_popups()
         
-        # Directly check if message typing box is present - synchronous check
+        # Check if message typing box is present; typing continues in the callback
         self._check_message_box_present()
+    
+    def _check_message_box_present(self):
+        """Check if message typing box is present - result arrives in _message_box_callback"""
+        print("Running simple message box detection...")
+        self.browser.page().runJavaScript(MESSAGE_BOX_DETECTION_JS, 0, self._message_box_callback)
+    
+    def _message_box_callback(self, result):
+        """Callback for the message box detection script"""
+        print(f"Simple detection result: {result}")
+        
+        # A previous attempt may already have typed the message
+        if self.message_sent:
+            return
+        
+        # Process the result
+        if result and result.get('present'):
+            self.message_box_present = True
+            print("Message input box is present and ready")
+        else:
+            self.message_box_present = False
+            reason = result.get('reason', 'Unknown reason') if result else 'No result returned'
+            print(f"Message input box not available: {reason}")
         
         # Only proceed with typing if message box is present
         if self.message_box_present:
             print("Message input box found, proceeding with message typing - stopping timer")
             # Stop the timer immediately to prevent multiple attempts
-            if hasattr(self, 'timer') and self.timer.isActive():
+            if self.timer.isActive():
                 self.timer.stop()
                 print("Automation timer stopped to prevent multiple attempts")
             
@@ -359,86 +424,10 @@ class BrowserAutomation:
         else:
             print("Message input box not found, skipping message typing")
             self.attempt_count += 1
-            if self.attempt_count >= self.max_attempts and hasattr(self, 'timer') and self.timer.isActive():
+            if self.attempt_count >= self.max_attempts and self.timer.isActive():
                 print("Max attempts reached, stopping automation")
                 self.timer.stop()
     
-    def _check_message_box_present(self):
-        """Directly check if message typing box is present - synchronous check"""
-        # Use a much simpler script first to test if JavaScript execution works
-        simple_test_script = """
-        (function() {
-            try {
-                console.log('=== SIMPLE TEST: JavaScript is executing ===');
-                return {success: true, message: 'JavaScript is working'};
-            } catch (error) {
-                return {success: false, error: error.toString()};
-            }
-        })()
-        """
-        
-        print("Testing JavaScript execution...")
-        try:
-            # Try running JavaScript on the browser page
-            test_result = self.browser.page().runJavaScript(simple_test_script, 0)
-            print(f"JavaScript test result: {test_result}")
-        except Exception as e:
-            print(f"ERROR: JavaScript execution failed with exception: {e}")
-            self.message_box_present = False
-            return
-        
-        if not test_result:
-            print("ERROR: JavaScript execution is failing - no result returned")
-            self.message_box_present = False
-            return
-        
-        # Now try the actual detection with a simpler approach
-        detection_script = """
-        (function() {
-            try {
-                console.log('=== MESSAGE BOX DETECTION STARTED ===');
-                
-                // Simple check for any contenteditable element
-                const box = document.querySelector('[contenteditable="true"]');
-                console.log('Found contenteditable element:', !!box);
-                
-                if (box) {
-                    console.log('Element details:', {
-                        tagName: box.tagName,
-                        className: box.className,
-                        ariaLabel: box.getAttribute('aria-label'),
-                        role: box.getAttribute('role'),
-                        dataLexicalEditor: box.getAttribute('data-lexical-editor')
-                    });
-                    return {present: true, element: 'found'};
-                } else {
-                    console.log('No contenteditable elements found');
-                    return {present: false, reason: 'No contenteditable elements'};
-                }
-            } catch (error) {
-                console.log('Error in detection script:', error);
-                return {present: false, reason: 'Script error: ' + error.toString()};
-            }
-        })()
-        """
-        
-        print("Running simple message box detection...")
-        try:
-            result = self.browser.page().runJavaScript(detection_script, 0)
-            print(f"Simple detection result: {result}")
-        except Exception as e:
-            print(f"ERROR: Detection script execution failed: {e}")
-            result = None
-        
-        # Process the result
-        if result and result.get('present'):
-            self.message_box_present = True
-            print("Message input box is present and ready")
-        else:
-            self.message_box_present = False
-            reason = result.get('reason', 'Unknown reason') if result else 'No result returned'
-            print(f"Message input box not available: {reason}")
-    
     def _check_for_errors_sync(self):
         """Synchronous error checking - waits for result before proceeding"""
         # Read error list from file
@@ -677,19 +666,7 @@ class BrowserAutomation:
             return errors
         except FileNotFoundError:
             print("Error: error_list.txt not found, using default error list")
-            return [
-                "This person is unavailable on Messenger.",
-                "can't access this chat yet", 
-                "You've reached the message request limit",
-                "This person isn't available right now",
-                "You can't message this account",
-                "Message request limit reached",
-                "This person isn't available",
-                "unavailable on Messenger",
-                "can't access this chat",
-                "Facebook user",
-                "This chat is now secured with end-to-end encryption."
-            ]
+            return list(DEFAULT_ERROR_LIST)
     
     def _error_check_callback(self, result):
         """Callback for error checking"""
@@ -713,13 +690,11 @@ class BrowserAutomation:
         self.message_sent = False
         self.attempt_count = 0
         
-        # Set up a timer to attempt typing periodically
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.attempt_typing)
+        # Attempt typing periodically using the timer owned by this instance
         self.timer.start(delay * 1000)  # Check every 'delay' seconds
         
         # Stop after max attempts
-        QTimer.singleShot(self.max_attempts * delay * 1000, lambda: self.timer.stop() if hasattr(self, 'timer') else None)
+        self.deadline_timer.start(self.max_attempts * delay * 1000)
 
 # Utility function to create automation instance
 def create_automation(browser):
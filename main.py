@@ -3,41 +3,89 @@ import os
 import random
 import json
 import time
-from datetime import datetime, date
+from collections import Counter
+from datetime import datetime, date, timedelta
 from PyQt6.QtCore import *
 from PyQt6.QtWidgets import *
 from PyQt6.QtWebEngineWidgets import *
-from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage, QWebEngineSettings
 from PyQt6.QtGui import QIcon, QAction
-from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtCore import QEvent
 
 
+# Pauses every <video>/<audio> element on a page
+PAUSE_MEDIA_JS = "document.querySelectorAll('video,audio').forEach(m => m.pause());"
+
+# Facebook and related domains on which tooltips are suppressed
+FACEBOOK_HOSTS = frozenset([
+    'facebook.com',
+    'www.facebook.com',
+    'm.facebook.com',
+    'web.facebook.com',
+    'messenger.com',
+    'www.messenger.com'
+])
+
+
 class FBWebView(QWebEngineView):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Host of the current page, kept up to date so event() never touches the QUrl
+        self.current_host = ''
+        self.urlChanged.connect(self.update_host)
+    
+    def update_host(self, url):
+        self.current_host = url.host()
+    
     def event(self, e):
-        if e.type() == QEvent.Type.ToolTip:
-            if self.is_facebook_host(self.url().host()):
-                return True   # eat the tooltip event on Facebook
+        # Fast path: every event lands here, only tooltips need the host check
+        if e.type() != QEvent.Type.ToolTip:
+            return super().event(e)
+        if self.current_host in FACEBOOK_HOSTS:
+            return True   # eat the tooltip event on Facebook
         return super().event(e)
-    
-    def is_facebook_host(self, host):
-        """Check if the current host is Facebook or related domains"""
-        facebook_hosts = [
-            'facebook.com',
-            'www.facebook.com',
-            'm.facebook.com',
-            'web.facebook.com',
-            'messenger.com',
-            'www.messenger.com'
-        ]
-        return host in facebook_hosts
 
 # Import automation module
 from automation import create_automation
 
+# Messenger thread URL prefix; the UID is appended per send
+MESSENGER_THREAD_URL = 'https://www.facebook.com/messages/t/'
+
+# Modern Chrome user agent for the persistent profile
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Fixed navigation targets, parsed once
+START_URL = QUrl('https://www.facebook.com')
+HOME_URL = QUrl('https://www.google.com')
+
+
+def read_env_file(path):
+    """Parse KEY=VALUE lines from an env file into a dict"""
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '=' not in line:
+                # Skip the stray line rather than dropping every other setting
+                print(f"Warning: ignoring malformed line in {path}: {line}")
+                continue
+            key, value = line.split('=', 1)
+            values[key.strip()] = value.strip()
+    return values
+
 
 class MessengerAutomation:
     def __init__(self):
+        # Cached date key for the daily stats, refreshed once the next midnight passes
+        self.today = None
+        self.next_midnight_ts = 0.0
+        
+        # Private RNG and pre-drawn batch of messages, refilled when empty
+        self.rng = random.Random()
+        self.message_batch = []
+        
         self.load_config()
         self.load_uids()
         self.load_messages()
@@ -50,6 +98,8 @@ class MessengerAutomation:
         # Current state
         self.current_uid = None
         self.current_message = None
+        self.current_url = None
+        self.load_started = False  # Set once our own navigation has started loading
         self.current_uid_status = None  # 'sent', 'error', 'attempting'
         self.current_uid_attempts = 0  # Track attempts per UID
         
@@ -65,22 +115,10 @@ class MessengerAutomation:
         }
         
         try:
-            with open('.env', 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        if key in self.config:
-                            # Convert to appropriate type
-                            if key in ['DELAY_BETWEEN_MESSAGES', 'MAX_MESSAGES_PER_DAY', 
-                                     'MESSAGE_RETRY_ATTEMPTS', 'PAGE_LOAD_WAIT_TIME',
-                                     'RETRY_DELAY_AFTER_FAILURE']:
-                                self.config[key] = int(value)
-                            elif key == 'MESSAGE_RETRY_DELAY':
-                                self.config[key] = int(value)
+            for key, value in read_env_file('.env').items():
+                if key in self.config:
+                    # Convert to the type of the default value
+                    self.config[key] = type(self.config[key])(value)
         except FileNotFoundError:
             print("Warning: .env file not found, using default configuration")
         except Exception as e:
@@ -92,7 +130,10 @@ class MessengerAutomation:
         """Load UIDs from uids.txt"""
         try:
             with open('uids.txt', 'r', encoding='utf-8') as f:
-                self.all_uids = [line.strip() for line in f if line.strip()]
+                # Same single-read parse as load_messages
+                self.all_uids = list(filter(None, map(str.strip, f.read().splitlines())))
+            # How many lines each UID occupies, so duplicates are counted like the file
+            self.uid_occurrences = Counter(self.all_uids)
             
             if not self.all_uids:
                 print("Error: No UIDs found in uids.txt")
@@ -111,7 +152,8 @@ class MessengerAutomation:
         """Load messages from messages.txt"""
         try:
             with open('messages.txt', 'r', encoding='utf-8') as f:
-                self.messages = [line.strip() for line in f if line.strip()]
+                # One read, then C-level splitlines/strip instead of a per-line Python loop
+                self.messages = list(filter(None, map(str.strip, f.read().splitlines())))
             
             if not self.messages:
                 print("Error: No messages found in messages.txt")
@@ -126,10 +168,20 @@ class MessengerAutomation:
             print(f"Error reading messages.txt: {e}")
             sys.exit(1)
     
+    @staticmethod
+    def new_daily_stats():
+        """Empty per-day counters for the tracker"""
+        return {
+            "total_attempted": 0,
+            "successful_sends": 0,
+            "errors": 0,
+            "used_uids": []
+        }
+    
     def load_tracker(self):
         """Load UID tracking data"""
         self.tracker_file = 'uid_tracker.json'
-        today = date.today().isoformat()
+        today = self.today_key()
         
         try:
             with open(self.tracker_file, 'r') as f:
@@ -139,23 +191,12 @@ class MessengerAutomation:
             if self.tracker['last_reset_date'] != today:
                 print(f"New day detected: {today}, resetting daily counters")
                 self.tracker['last_reset_date'] = today
-                self.tracker['daily_stats'][today] = {
-                    "total_attempted": 0,
-                    "successful_sends": 0,
-                    "errors": 0,
-                    "used_uids": []
-                }
+                self.tracker['daily_stats'][today] = self.new_daily_stats()
                 self.save_tracker()
-            else:
+            elif today not in self.tracker['daily_stats']:
                 # Ensure today's stats exist
-                if today not in self.tracker['daily_stats']:
-                    self.tracker['daily_stats'][today] = {
-                        "total_attempted": 0,
-                        "successful_sends": 0,
-                        "errors": 0,
-                        "used_uids": []
-                    }
-                    self.save_tracker()
+                self.tracker['daily_stats'][today] = self.new_daily_stats()
+                self.save_tracker()
                     
         except FileNotFoundError:
             # Initialize new tracker
@@ -163,24 +204,46 @@ class MessengerAutomation:
                 "last_reset_date": today,
                 "used_uids": [],
                 "daily_stats": {
-                    today: {
-                        "total_attempted": 0,
-                        "successful_sends": 0,
-                        "errors": 0,
-                        "used_uids": []
-                    }
+                    today: self.new_daily_stats()
                 }
             }
             self.save_tracker()
         except Exception as e:
             print(f"Error loading tracker: {e}")
             sys.exit(1)
+        
+        # In-memory mirror of used_uids, kept in sync by record_uid_attempt
+        self.used_uid_set = set(self.tracker['used_uids'])
+        # Position in all_uids before which every UID is known to be used
+        self.uid_cursor = 0
+        # Unused entries left in uids.txt, decremented as UIDs are used
+        self.available_uid_count = sum(uid not in self.used_uid_set for uid in self.all_uids)
             
         # Print current status
         today_stats = self.tracker['daily_stats'][today]
         print(f"Today's Status: {today_stats['successful_sends']} sent, {today_stats['errors']} errors, {today_stats['total_attempted']} attempted")
         print(f"Total used UIDs: {len(self.tracker['used_uids'])}")
-        print(f"Available UIDs: {len(self.all_uids) - len(self.tracker['used_uids'])}")
+        print(f"Available UIDs: {self.available_uid_count}")
+    
+    def today_key(self):
+        """Return today's date key, recomputing the date only after midnight"""
+        if time.time() >= self.next_midnight_ts:
+            today = date.today()
+            self.today = today.isoformat()
+            next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+            self.next_midnight_ts = next_midnight.timestamp()
+        return self.today
+    
+    def today_stats(self):
+        """Return today's stats entry, creating it on the first use of a new day"""
+        today = self.today_key()
+        daily_stats = self.tracker['daily_stats']
+        stats = daily_stats.get(today)
+        if stats is None:
+            # Day rolled over while running
+            self.tracker['last_reset_date'] = today
+            stats = daily_stats[today] = self.new_daily_stats()
+        return stats
     
     def save_tracker(self):
         """Save UID tracking data"""
@@ -190,23 +253,26 @@ class MessengerAutomation:
         except Exception as e:
             print(f"Error saving tracker: {e}")
     
-    def get_available_uids(self):
-        """Get list of UIDs that haven't been used yet"""
-        used_set = set(self.tracker['used_uids'])
-        available = [uid for uid in self.all_uids if uid not in used_set]
-        return available
+    def next_uid_index(self):
+        """Return the index of the first unused UID in file order"""
+        # Used UIDs are never released, so the scan resumes where it last stopped
+        all_uids = self.all_uids
+        used_set = self.used_uid_set
+        i = self.uid_cursor
+        while i < len(all_uids) and all_uids[i] in used_set:
+            i += 1
+        self.uid_cursor = i
+        return i
     
     def can_send_more_today(self):
         """Check if we can send more messages today"""
-        today = date.today().isoformat()
-        today_stats = self.tracker['daily_stats'][today]
+        today_stats = self.today_stats()
         
         if today_stats['successful_sends'] >= self.config['MAX_MESSAGES_PER_DAY']:
             print(f"Daily limit reached: {today_stats['successful_sends']}/{self.config['MAX_MESSAGES_PER_DAY']}")
             return False
         
-        available_uids = self.get_available_uids()
-        if not available_uids:
+        if self.next_uid_index() >= len(self.all_uids):
             print("No more available UIDs to try")
             return False
             
@@ -214,60 +280,62 @@ class MessengerAutomation:
     
     def select_next_uid_and_message(self):
         """Select next available UID and random message - process in file order"""
-        available_uids = self.get_available_uids()
+        index = self.next_uid_index()
         
-        if not available_uids:
+        if index >= len(self.all_uids):
             print("No available UIDs left")
             return None, None
             
         # Process UIDs in the order they appear in the original file
         # This ensures systematic processing from top to bottom
-        for uid in self.all_uids:
-            if uid in available_uids:
-                self.current_uid = uid
-                self.current_message = random.choice(self.messages)
-                self.current_uid_status = 'attempting'
-                
-                print(f"Selected UID: {self.current_uid} (in file order)")
-                print(f"Selected message: {self.current_message}")
-                print(f"Available UIDs remaining: {len(available_uids) - 1}")
-                
-                return self.current_uid, self.current_message
+        self.current_uid = self.all_uids[index]
+        self.current_message = self.next_message()
+        self.current_uid_status = 'attempting'
+        
+        print(f"Selected UID: {self.current_uid} (in file order)")
+        print(f"Selected message: {self.current_message}")
+        print(f"Available UIDs remaining: {self.available_uid_count - 1}")
         
-        # Fallback if no UID found (shouldn't happen)
-        return None, None
+        return self.current_uid, self.current_message
+    
+    def next_message(self):
+        """Return a random message, drawing them in batches"""
+        if not self.message_batch:
+            self.message_batch = self.rng.choices(self.messages, k=256)
+        return self.message_batch.pop()
     
     def record_uid_attempt(self, success, error_reason=None):
         """Record UID attempt result"""
-        today = date.today().isoformat()
-        
         # Add to used UIDs if not already there
-        if self.current_uid not in self.tracker['used_uids']:
+        if self.current_uid not in self.used_uid_set:
+            self.used_uid_set.add(self.current_uid)
             self.tracker['used_uids'].append(self.current_uid)
+            self.available_uid_count -= self.uid_occurrences[self.current_uid]
         
-        # Update daily stats
-        self.tracker['daily_stats'][today]['total_attempted'] += 1
+        # Update daily stats through a single lookup of today's entry
+        today_stats = self.today_stats()
+        today_stats['total_attempted'] += 1
         
         if success:
-            self.tracker['daily_stats'][today]['successful_sends'] += 1
+            today_stats['successful_sends'] += 1
             self.current_uid_status = 'sent'
-            print(f"✅ UID {self.current_uid} - Message sent successfully")
+            result = f"✅ UID {self.current_uid} - Message sent successfully"
         else:
-            self.tracker['daily_stats'][today]['errors'] += 1
+            today_stats['errors'] += 1
             self.current_uid_status = 'error'
             error_msg = f" - {error_reason}" if error_reason else ""
-            print(f"❌ UID {self.current_uid} - Failed{error_msg}")
+            result = f"❌ UID {self.current_uid} - Failed{error_msg}"
         
         # Add to today's used UIDs
-        if self.current_uid not in self.tracker['daily_stats'][today]['used_uids']:
-            self.tracker['daily_stats'][today]['used_uids'].append(self.current_uid)
+        if self.current_uid not in today_stats['used_uids']:
+            today_stats['used_uids'].append(self.current_uid)
         
         self.save_tracker()
         
-        # Print updated status
-        today_stats = self.tracker['daily_stats'][today]
-        print(f"Progress: {today_stats['successful_sends']} sent, {today_stats['errors']} errors, {today_stats['total_attempted']} attempted")
-        print(f"Available UIDs remaining: {len(self.get_available_uids())}")
+        # Report the result and updated status as one summary line per send
+        print(f"{result} | Progress: {today_stats['successful_sends']} sent, "
+              f"{today_stats['errors']} errors, {today_stats['total_attempted']} attempted | "
+              f"Available UIDs remaining: {self.available_uid_count}")
     
     def start_automation(self):
         """Start the automation process"""
@@ -284,28 +352,41 @@ class MessengerAutomation:
         # Reset attempt counter for new UID
         self.current_uid_attempts = 0
         
-        # Disconnect any previous loadFinished connections to prevent stacking
-        try:
-            self.window.current_browser().loadFinished.disconnect()
-        except:
-            pass
-        
-        # Set up automation
-        self.automation = create_automation(self.window.current_browser())
-        self.automation.set_message(message)
+        # Set up automation once per browser view and reuse it for every UID
+        browser = self.window.current_browser()
+        if self.automation is None or self.automation.browser is not browser:
+            self.automation = create_automation(browser)
         
         # Navigate to the selected UID with proper timing
-        url = f'https://www.facebook.com/messages/t/{uid}'
-        print(f"Navigating to: {url}")
+        self.current_url = QUrl(MESSENGER_THREAD_URL + uid)
+        print(f"Navigating to: {self.current_url.toString()}")
         
         # Use a small delay before navigation to ensure browser is ready
-        QTimer.singleShot(500, lambda: self.window.current_browser().setUrl(QUrl(url)))
+        QTimer.singleShot(500, self.navigate_to_current_uid)
+    
+    def navigate_to_current_uid(self):
+        """Load the chat for the currently selected UID"""
+        browser = self.automation.browser
         
-        # Start automation after page loads (single connection)
-        self.window.current_browser().loadFinished.connect(self.on_page_loaded, Qt.ConnectionType.QueuedConnection)
+        # Start automation after this navigation loads (single-shot connections,
+        # so slots never stack). Only a loadFinished that follows our own
+        # loadStarted belongs to this navigation.
+        self.load_started = False
+        browser.loadStarted.connect(self.on_load_started, Qt.ConnectionType.SingleShotConnection)
+        browser.loadFinished.connect(self.on_page_loaded, Qt.ConnectionType.SingleShotConnection)
+        browser.setUrl(self.current_url)
+    
+    def on_load_started(self):
+        """Mark that the navigation to the current UID has begun"""
+        self.load_started = True
     
     def on_page_loaded(self, success):
         """Callback when page is loaded"""
+        if not self.load_started:
+            # A load that was already running finished before ours began; keep waiting
+            self.automation.browser.loadFinished.connect(self.on_page_loaded, Qt.ConnectionType.SingleShotConnection)
+            return
+        
         if success:
             print(f"Page loaded successfully, waiting {self.config['PAGE_LOAD_WAIT_TIME']} seconds for full load...")
             # Wait for page to fully load, then start automation
@@ -313,7 +394,7 @@ class MessengerAutomation:
         else:
             print("Failed to load page")
             self.record_uid_attempt(False, "Page load failed")
-            QTimer.singleShot(self.config['RETRY_DELAY_AFTER_FAILURE'] * 1000, self.start_automation)
+            QTimer.singleShot(self.retry_delay_ms(), self.start_automation)
     
     def start_message_automation(self):
         """Start the message automation"""
@@ -324,36 +405,49 @@ class MessengerAutomation:
                 callback=self.on_message_completed
             )
     
+    def retry_delay_ms(self):
+        """Delay before retrying after a failure, with up to 20% random jitter"""
+        # Jitter keeps repeated failures from retrying on an exact fixed period
+        base_ms = self.config['RETRY_DELAY_AFTER_FAILURE'] * 1000
+        return base_ms + self.rng.randrange(base_ms // 5 + 1)
+    
     def on_message_completed(self, success):
         """Callback when message automation completes"""
+        # Read the settings used below once per result
+        config = self.config
+        max_attempts = config['MESSAGE_RETRY_ATTEMPTS']
+        uid = self.current_uid
+        
         if success:
             self.record_uid_attempt(True)
             
             # Schedule next message after delay if we can send more
             if self.can_send_more_today():
-                delay_ms = self.config['DELAY_BETWEEN_MESSAGES'] * 1000
-                print(f"Waiting {self.config['DELAY_BETWEEN_MESSAGES']} seconds before next message...")
-                QTimer.singleShot(delay_ms, self.start_automation)
+                delay = config['DELAY_BETWEEN_MESSAGES']
+                print(f"Waiting {delay} seconds before next message...")
+                QTimer.singleShot(delay * 1000, self.start_automation)
             else:
                 print("Daily limit reached or no more UIDs. Automation stopped.")
         else:
             # Increment attempt counter for current UID
             self.current_uid_attempts += 1
-            print(f"Attempt {self.current_uid_attempts}/{self.config['MESSAGE_RETRY_ATTEMPTS']} for UID {self.current_uid}")
+            print(f"Attempt {self.current_uid_attempts}/{max_attempts} for UID {uid}")
             
             # Check if we should retry the same UID or move to next
-            if self.current_uid_attempts < self.config['MESSAGE_RETRY_ATTEMPTS']:
+            if self.current_uid_attempts < max_attempts:
                 # Retry same UID
-                print(f"Retrying UID {self.current_uid} after {self.config['RETRY_DELAY_AFTER_FAILURE']} seconds...")
-                QTimer.singleShot(self.config['RETRY_DELAY_AFTER_FAILURE'] * 1000, self.start_automation)
+                retry_ms = self.retry_delay_ms()
+                print(f"Retrying UID {uid} after {retry_ms / 1000:.1f} seconds...")
+                QTimer.singleShot(retry_ms, self.start_automation)
             else:
                 # Max attempts reached for this UID, record failure and move to next
-                self.record_uid_attempt(False, f"Message typing failed after {self.config['MESSAGE_RETRY_ATTEMPTS']} attempts")
+                self.record_uid_attempt(False, f"Message typing failed after {max_attempts} attempts")
                 
                 # Try next UID after delay if we can send more
                 if self.can_send_more_today():
-                    print(f"Max attempts reached for UID {self.current_uid}, trying next UID after {self.config['RETRY_DELAY_AFTER_FAILURE']} seconds...")
-                    QTimer.singleShot(self.config['RETRY_DELAY_AFTER_FAILURE'] * 1000, self.start_automation)
+                    retry_ms = self.retry_delay_ms()
+                    print(f"Max attempts reached for UID {uid}, trying next UID after {retry_ms / 1000:.1f} seconds...")
+                    QTimer.singleShot(retry_ms, self.start_automation)
                 else:
                     print("Daily limit reached or no more UIDs. Automation stopped.")
     
@@ -367,7 +461,39 @@ class MessengerAutomation:
         return self.window
 
 
+def create_profile(storage_path, parent):
+    """Create the persistent browser profile stored under storage_path"""
+    # Create portable profile directory
+    if not os.path.exists(storage_path):
+        os.makedirs(storage_path)
+    
+    # Parented to the window, so it is torn down together with its pages
+    profile = QWebEngineProfile("persistent_profile", parent)
+    profile.setPersistentStoragePath(storage_path)
+    profile.setCachePath(storage_path)
+    
+    # Set a modern Chrome user agent
+    profile.setHttpUserAgent(USER_AGENT)
+    
+    # Turn off browser features the automation never uses
+    profile.setSpellCheckEnabled(False)
+    settings = profile.settings()
+    settings.setAttribute(QWebEngineSettings.WebAttribute.PluginsEnabled, False)
+    settings.setAttribute(QWebEngineSettings.WebAttribute.PdfViewerEnabled, False)
+    settings.setAttribute(QWebEngineSettings.WebAttribute.AutoLoadIconsForPage, False)
+    return profile
+
+
 class MainWindow(QMainWindow):
+    # Toolbar buttons as (label, slot name), built in order by __init__
+    NAV_ACTIONS = (
+        ('⮜', 'navigate_back'),
+        ('⮞', 'navigate_forward'),
+        ('⟳', 'reload_page'),
+        ('⌂', 'navigate_home'),  # Home Button
+        ('+', 'add_tab'),        # Add a new tab button
+    )
+
     def __init__(self):
         super(MainWindow, self).__init__()
 
@@ -379,73 +505,44 @@ class MainWindow(QMainWindow):
         self.tabs.setTabsClosable(False)   # remove the ✕, so no "Close" tooltip
         self.setCentralWidget(self.tabs)
 
-        # Create portable profile directory
+        # Portable persistent profile
         self.profile_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile_data')
-        if not os.path.exists(self.profile_path):
-            os.makedirs(self.profile_path)
-        
-        # Create persistent profile
-        self.profile = QWebEngineProfile("persistent_profile", self)
-        self.profile.setPersistentStoragePath(self.profile_path)
-        self.profile.setCachePath(self.profile_path)
-        
-        # Set a modern Chrome user agent
-        modern_user_agent = (
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) '
-            'Chrome/120.0.0.0 Safari/537.36'
-        )
-        self.profile.setHttpUserAgent(modern_user_agent)
+        self.profile = create_profile(self.profile_path, self)
         
         self.add_tab()
 
         # navbar
         navbar = QToolBar()
         self.addToolBar(navbar)
-
-        
-        back_btn = QAction('⮜', self)
-        back_btn.triggered.connect(lambda: self.current_browser().back())
-        navbar.addAction(back_btn)
-
-        forward_btn = QAction('⮞', self)
-        forward_btn.triggered.connect(lambda: self.current_browser().forward())
-        navbar.addAction(forward_btn)
-
-        reload_btn = QAction('⟳', self)
-        reload_btn.triggered.connect(lambda: self.current_browser().reload())
-        navbar.addAction(reload_btn)
-
-        # Home Button
-        home_btn = QAction('⌂', self)
-        home_btn.triggered.connect(self.navigate_home)
-        navbar.addAction(home_btn)
-
-        # Add a new tab button
-        add_tab_btn = QAction('+', self)
-        add_tab_btn.triggered.connect(self.add_tab)
-        navbar.addAction(add_tab_btn)
+        for label, slot_name in self.NAV_ACTIONS:
+            action = QAction(label, self)
+            action.triggered.connect(getattr(self, slot_name))
+            navbar.addAction(action)
 
         # Add a url bar
         self.url_bar = QLineEdit()
         self.url_bar.returnPressed.connect(self.navigate_to_url)
         navbar.addWidget(self.url_bar)
         self.url_bar.setStyleSheet('width: 50%;')
-        self.current_browser().urlChanged.connect(self.update_url)
+        
+        # Coalesce bursts of urlChanged (redirects, history pushes) into one URL bar update
+        self.pending_url = ''
+        self.url_update_timer = QTimer(self)
+        self.url_update_timer.setSingleShot(True)
+        self.url_update_timer.setInterval(50)
+        self.url_update_timer.timeout.connect(self.flush_url_bar)
         
 
     def add_tab(self):
         # Create browser with persistent profile using custom FBWebView
         browser = FBWebView()
         browser.setPage(QWebEnginePage(self.profile, browser))
-        browser.setUrl(QUrl('https://www.facebook.com'))
+        browser.setUrl(START_URL)
         self.tabs.addTab(browser, 'facebook')
         self.tabs.setCurrentWidget(browser)
         self.tabs.setTabText(self.tabs.currentIndex(), 'Loading...')
-        browser.titleChanged.connect(
-            lambda title, browser=browser: self.tabs.setTabText(self.tabs.indexOf(browser), title))
-        browser.urlChanged.connect(
-            lambda url, browser=browser: self.update_url(url) if self.tabs.currentWidget() == browser else None)
+        browser.titleChanged.connect(self.update_title)
+        browser.urlChanged.connect(self.update_url)
         
 
     
@@ -453,9 +550,8 @@ class MainWindow(QMainWindow):
         # Get the browser widget at the specified index
         browser_widget = self.tabs.widget(index)
     
-        # Stop the video (if it is a video)
-        if browser_widget.url().host() == "www.youtube.com":
-            browser_widget.page().runJavaScript("document.getElementsByTagName('video')[0].pause();")
+        # Pause any playing media
+        browser_widget.page().runJavaScript(PAUSE_MEDIA_JS)
         
         # Remove the tab
         if self.tabs.count() < 2:
@@ -470,29 +566,46 @@ class MainWindow(QMainWindow):
     def current_browser(self):
         return self.tabs.currentWidget()
 
+    def navigate_back(self):
+        self.current_browser().back()
+
+    def navigate_forward(self):
+        self.current_browser().forward()
+
+    def reload_page(self):
+        self.current_browser().reload()
+
     def navigate_home(self):
-        self.current_browser().setUrl(QUrl('https://www.google.com'))
+        self.current_browser().setUrl(HOME_URL)
 
     def navigate_to_url(self):
-        url = self.url_bar.text()
-        if 'http' not in url:
-            url = 'https://' + url
-        self.current_browser().setUrl(QUrl(url))
+        text = self.url_bar.text().strip()
+        url = QUrl.fromUserInput(text)
+        if not url.isValid():
+            return
+        # fromUserInput assumes http:// for bare hosts; keep defaulting to https
+        if url.scheme() == 'http' and not text.lower().startswith('http:'):
+            url.setScheme('https')
+        self.current_browser().setUrl(url)
+    
+    def update_title(self, title):
+        browser = self.sender()
+        self.tabs.setTabText(self.tabs.indexOf(browser), title)
     
     def update_url(self, q):
         if self.sender() == self.current_browser():
-            self.url_bar.setText(q.toString())
+            self.pending_url = q.toString()
+            self.url_update_timer.start()
+    
+    def flush_url_bar(self):
+        if self.pending_url != self.url_bar.text():
+            self.url_bar.setText(self.pending_url)
             self.url_bar.setCursorPosition(0)
 
     def closeEvent(self, event):
+        # Pause media in every tab with one JS call per page; no widget-tree walk
         for i in range(self.tabs.count()):
-            # get the browser widget in the current tab
-            browser = self.tabs.widget(i)
-            # get the video widget, if it exists
-            video_widget = browser.findChild(QVideoWidget)
-            if video_widget:
-                # stop the video
-                video_widget.player().stop()
+            self.tabs.widget(i).page().runJavaScript(PAUSE_MEDIA_JS)
         event.accept()
 
 
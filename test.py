@@ -37,7 +37,6 @@ from PyQt6.QtWebEngineCore import (
     QWebEngineProfile, QWebEnginePage, QWebEngineScript, QWebEngineSettings
 )
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtMultimediaWidgets import QVideoWidget
 
 # ---------- Optional automation module (safe stub if missing) ----------
 try:
@@ -56,6 +55,13 @@ except Exception as e:
         return NoOpAutomation()
 
 # ---------- Utilities ----------
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+MESSENGER_THREAD_URL = "https://www.facebook.com/messages/t/"
+START_URL = QUrl("https://www.facebook.com")
+HOME_URL = QUrl("https://www.google.com")
+# Pauses every <video>/<audio> element on a page
+PAUSE_MEDIA_JS = "document.querySelectorAll('video,audio').forEach(m => m.pause());"
+
 def is_facebook_host(host: str) -> bool:
     if not host:
         return False
@@ -127,6 +133,66 @@ HIDE_CLOSE_BUTTONS_JS = r"""
   document.documentElement.appendChild(s);
 })();""" % FB_HOST_CHECK_JS
 
+# ---------- Persistent profile ----------
+def _install_fb_scripts(profile):
+    def insert(name, source):
+        scr = QWebEngineScript()
+        scr.setName(name)
+        scr.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+        scr.setRunsOnSubFrames(True)
+        scr.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+        scr.setSourceCode(source)
+        profile.scripts().insert(scr)
+    insert("FB_HideOverlays", HIDE_OVERLAYS_CSS_JS)
+    insert("FB_RemoveCloseTooltips", REMOVE_CLOSE_TOOLTIPS_JS)
+    insert("FB_HideCloseButtons", HIDE_CLOSE_BUTTONS_JS)
+
+def create_profile(storage_path: str, parent: QObject) -> QWebEngineProfile:
+    """Create the persistent browser profile stored under storage_path."""
+    os.makedirs(storage_path, exist_ok=True)
+    # Parented to the window, so it is torn down together with its pages
+    profile = QWebEngineProfile("persistent_profile", parent)
+    profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
+    profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+    profile.setPersistentStoragePath(storage_path)
+    profile.setCachePath(storage_path)
+    profile.setHttpCacheMaximumSize(512 * 1024 * 1024)  # 512MB cache
+
+    # Modern UA & language
+    profile.setHttpUserAgent(USER_AGENT)
+    profile.setHttpAcceptLanguage("en-US,en;q=0.9")
+
+    # Allow 3rd-party cookies if available (helps with FB flows)
+    try:
+        profile.setThirdPartyCookiePolicy(QWebEngineProfile.ThirdPartyCookiePolicy.AlwaysAllowThirdPartyCookies)
+    except Exception:
+        pass
+
+    # Global feature settings
+    s = profile.settings()
+    for attr in [
+        QWebEngineSettings.WebAttribute.JavascriptEnabled,
+        QWebEngineSettings.WebAttribute.JavascriptCanOpenWindows,
+        QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard,
+        QWebEngineSettings.WebAttribute.LocalStorageEnabled,
+        QWebEngineSettings.WebAttribute.Accelerated2dCanvasEnabled,
+        QWebEngineSettings.WebAttribute.WebGLEnabled,
+        QWebEngineSettings.WebAttribute.AutoLoadImages,
+        QWebEngineSettings.WebAttribute.PluginsEnabled,
+        QWebEngineSettings.WebAttribute.FullScreenSupportEnabled,
+        QWebEngineSettings.WebAttribute.ScreenCaptureEnabled,
+        QWebEngineSettings.WebAttribute.SpatialNavigationEnabled,
+        QWebEngineSettings.WebAttribute.TouchIconsEnabled,
+        QWebEngineSettings.WebAttribute.FocusOnNavigationEnabled,
+    ]:
+        s.setAttribute(attr, True)
+    # Autoplay media without gesture
+    s.setAttribute(QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, False)
+
+    # Install FB-only helper scripts (backup; main tooltip block is in FBWebView.event)
+    _install_fb_scripts(profile)
+    return profile
+
 # ---------- Main Browser Window ----------
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -141,56 +207,13 @@ class MainWindow(QMainWindow):
 
         # Persistent profile setup
         self.profile_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profile_data")
-        os.makedirs(self.profile_path, exist_ok=True)
-        self.profile = QWebEngineProfile("persistent_profile", self)
-        self.profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
-        self.profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
-        self.profile.setPersistentStoragePath(self.profile_path)
-        self.profile.setCachePath(self.profile_path)
-        self.profile.setHttpCacheMaximumSize(512 * 1024 * 1024)  # 512MB cache
-
-        # Modern UA & language
-        self.profile.setHttpUserAgent(
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
-        )
-        self.profile.setHttpAcceptLanguage("en-US,en;q=0.9")
-
-        # Allow 3rd-party cookies if available (helps with FB flows)
-        try:
-            self.profile.setThirdPartyCookiePolicy(QWebEngineProfile.ThirdPartyCookiePolicy.AlwaysAllowThirdPartyCookies)
-        except Exception:
-            pass
-
-        # Global feature settings
-        s = self.profile.settings()
-        for attr in [
-            QWebEngineSettings.WebAttribute.JavascriptEnabled,
-            QWebEngineSettings.WebAttribute.JavascriptCanOpenWindows,
-            QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard,
-            QWebEngineSettings.WebAttribute.LocalStorageEnabled,
-            QWebEngineSettings.WebAttribute.Accelerated2dCanvasEnabled,
-            QWebEngineSettings.WebAttribute.WebGLEnabled,
-            QWebEngineSettings.WebAttribute.AutoLoadImages,
-            QWebEngineSettings.WebAttribute.PluginsEnabled,
-            QWebEngineSettings.WebAttribute.FullScreenSupportEnabled,
-            QWebEngineSettings.WebAttribute.ScreenCaptureEnabled,
-            QWebEngineSettings.WebAttribute.SpatialNavigationEnabled,
-            QWebEngineSettings.WebAttribute.TouchIconsEnabled,
-            QWebEngineSettings.WebAttribute.FocusOnNavigationEnabled,
-        ]:
-            s.setAttribute(attr, True)
-        # Autoplay media without gesture
-        s.setAttribute(QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, False)
-
-        # Install FB-only helper scripts (backup; main tooltip block is in FBWebView.event)
-        self._install_fb_scripts()
+        self.profile = create_profile(self.profile_path, self)
 
         # Toolbar
         tb = QToolBar(); self.addToolBar(tb)
-        act_back = QAction("⮜", self); act_back.triggered.connect(lambda: self.current_browser().back()); tb.addAction(act_back)
-        act_fwd = QAction("⮞", self); act_fwd.triggered.connect(lambda: self.current_browser().forward()); tb.addAction(act_fwd)
-        act_reload = QAction("⟳", self); act_reload.triggered.connect(lambda: self.current_browser().reload()); tb.addAction(act_reload)
+        act_back = QAction("⮜", self); act_back.triggered.connect(self.navigate_back); tb.addAction(act_back)
+        act_fwd = QAction("⮞", self); act_fwd.triggered.connect(self.navigate_forward); tb.addAction(act_fwd)
+        act_reload = QAction("⟳", self); act_reload.triggered.connect(self.reload_page); tb.addAction(act_reload)
         act_home = QAction("⌂", self); act_home.triggered.connect(self.navigate_home); tb.addAction(act_home)
         act_new = QAction("+", self); act_new.triggered.connect(self.add_tab); tb.addAction(act_new)
 
@@ -200,19 +223,6 @@ class MainWindow(QMainWindow):
         # First tab
         self.add_tab()
 
-    def _install_fb_scripts(self):
-        def insert(name, source):
-            scr = QWebEngineScript()
-            scr.setName(name)
-            scr.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
-            scr.setRunsOnSubFrames(True)
-            scr.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
-            scr.setSourceCode(source)
-            self.profile.scripts().insert(scr)
-        insert("FB_HideOverlays", HIDE_OVERLAYS_CSS_JS)
-        insert("FB_RemoveCloseTooltips", REMOVE_CLOSE_TOOLTIPS_JS)
-        insert("FB_HideCloseButtons", HIDE_CLOSE_BUTTONS_JS)
-
     def _wire_feature_permissions(self, page: QWebEnginePage):
         def on_perm(origin, feature):
             host = origin.host()
@@ -231,38 +241,51 @@ class MainWindow(QMainWindow):
         page.settings().setAttribute(QWebEngineSettings.WebAttribute.FullScreenSupportEnabled, True)
         page.settings().setAttribute(QWebEngineSettings.WebAttribute.ScreenCaptureEnabled, True)
 
-        view.setUrl(QUrl("https://www.facebook.com"))
+        view.setUrl(START_URL)
         self.tabs.addTab(view, "Facebook")
         self.tabs.setCurrentWidget(view)
         self.tabs.setTabText(self.tabs.currentIndex(), "Loading...")
-        view.titleChanged.connect(lambda t, v=view: self.tabs.setTabText(self.tabs.indexOf(v), t))
-        view.urlChanged.connect(lambda url, v=view: self._sync_urlbar(url, v))
+        # Bound slots shared by every tab; the emitting view comes from sender()
+        view.titleChanged.connect(self._sync_tab_title)
+        view.urlChanged.connect(self._sync_urlbar)
 
-    def _sync_urlbar(self, url: QUrl, view: QWebEngineView):
-        if self.tabs.currentWidget() == view:
+    def _sync_tab_title(self, title: str):
+        self.tabs.setTabText(self.tabs.indexOf(self.sender()), title)
+
+    def _sync_urlbar(self, url: QUrl):
+        if self.tabs.currentWidget() is self.sender():
             self.url_bar.setText(url.toString())
             self.url_bar.setCursorPosition(0)
 
     def current_browser(self) -> QWebEngineView:
         return self.tabs.currentWidget()
 
+    def navigate_back(self):
+        self.current_browser().back()
+
+    def navigate_forward(self):
+        self.current_browser().forward()
+
+    def reload_page(self):
+        self.current_browser().reload()
+
     def navigate_home(self):
-        self.current_browser().setUrl(QUrl("https://www.google.com"))
+        self.current_browser().setUrl(HOME_URL)
 
     def navigate_to_url(self):
-        url = self.url_bar.text().strip()
-        if not url:
+        text = self.url_bar.text().strip()
+        url = QUrl.fromUserInput(text)
+        if not url.isValid():
             return
-        if not url.startswith(("http://", "https://")):
-            url = "https://" + url
-        self.current_browser().setUrl(QUrl(url))
+        # fromUserInput assumes http:// for bare hosts; keep defaulting to https
+        if url.scheme() == "http" and not text.lower().startswith("http:"):
+            url.setScheme("https")
+        self.current_browser().setUrl(url)
 
     def closeEvent(self, event):
+        # Pause media in every tab with one JS call per page; no widget-tree walk
         for i in range(self.tabs.count()):
-            browser = self.tabs.widget(i)
-            vw = browser.findChild(QVideoWidget)
-            if vw:
-                vw.player().stop()
+            self.tabs.widget(i).page().runJavaScript(PAUSE_MEDIA_JS)
         event.accept()
 
 # ---------- Automation wrapper ----------
@@ -270,6 +293,7 @@ class MessengerAutomation:
     def __init__(self):
         self.load_config(); self.load_stats()
         self.current_uid = None; self.current_message = None
+        self.load_started = False  # set once our own navigation has started loading
         self.messages_sent_in_session = 0
         self.uids = self._read_lines("uids.txt")
         self.messages = self._read_lines("messages.txt")
@@ -279,6 +303,7 @@ class MessengerAutomation:
             print("Error: No messages found in messages.txt");
         self.window = MainWindow()
         self.automation = None
+        self.automation_is_demo = False
 
     def load_config(self):
         self.config = {
@@ -329,16 +354,29 @@ class MessengerAutomation:
             print("Daily limit reached.")
             return
 
-        self.automation = create_automation(self.window.current_browser())
-        self.automation.set_message(message)
-        self.window.current_browser().setUrl(QUrl(f"https://www.facebook.com/messages/t/{uid}"))
-        self.window.current_browser().loadFinished.connect(self._after_load)
+        browser = self.window.current_browser()
+        if self.automation is None or getattr(self.automation, "browser", browser) is not browser:
+            self.automation = create_automation(browser)
+            # Probe the stub flag once per automation instead of on every result
+            self.automation_is_demo = getattr(self.automation, "is_demo", False)
+        # Only a loadFinished that follows our own loadStarted belongs to this navigation
+        self.load_started = False
+        browser.loadStarted.connect(self._on_load_started, Qt.ConnectionType.SingleShotConnection)
+        browser.loadFinished.connect(self._after_load, Qt.ConnectionType.SingleShotConnection)
+        browser.setUrl(QUrl(MESSENGER_THREAD_URL + uid))
+
+    def _on_load_started(self):
+        self.load_started = True
 
     def _after_load(self, ok):
+        if not self.load_started:
+            # a load that was already running finished before ours began; keep waiting
+            self.window.current_browser().loadFinished.connect(self._after_load, Qt.ConnectionType.SingleShotConnection)
+            return
         if not ok: return
         click = "(function(){try{const b=document.body; if(b&&b.click) b.click();}catch(e){}})();"
         self.window.current_browser().page().runJavaScript(click)
-        QTimer.singleShot(1000, lambda: QTimer.singleShot(self.config["PAGE_LOAD_WAIT_TIME"]*1000, self._send))
+        QTimer.singleShot(1000 + self.config["PAGE_LOAD_WAIT_TIME"]*1000, self._send)
 
     def _send(self):
         if self.automation:
@@ -349,7 +387,7 @@ class MessengerAutomation:
             )
 
     def _sent_cb(self, ok):
-        if getattr(self.automation, "is_demo", False):
+        if self.automation_is_demo:
             print("[DEMO] Automation stub finished once. Not looping further.")
             return
         if ok: